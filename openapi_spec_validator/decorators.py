@@ -1,11 +1,15 @@
 """OpenAPI spec validator decorators module."""
 from functools import wraps
 import logging
+import os
 
 from openapi_spec_validator.managers import VisitingManager
 
 log = logging.getLogger(__name__)
 
+# Set OPENAPI_WRAP_ERRORS=0 before import to yield raw jsonschema errors
+_WRAP_ERRORS = os.environ.get('OPENAPI_WRAP_ERRORS', '1') != '0'
+
 
 class DerefValidatorDecorator:
     """Dereferences instance if it is a $ref before passing it for validation.
@@ -53,6 +57,9 @@ class ValidationErrorWrapper(object):
         self.error_class = error_class
 
     def __call__(self, f):
+        if not _WRAP_ERRORS:
+            return f
+
         @wraps(f)
         def wrapper(*args, **kwds):
             errors = f(*args, **kwds)
@@ -19,3 +19,7 @@ class UnresolvableParameterError(OpenAPIValidationError):
 
 class DuplicateOperationIDError(OpenAPIValidationError):
     pass
+
+
+class CircularReferenceError(OpenAPIValidationError):
+    pass
@@ -1,12 +1,13 @@
 import logging
-import string
+import re
+from urllib.parse import urldefrag
 
 from jsonschema.validators import RefResolver
 from openapi_schema_validator import OAS31Validator, oas31_format_checker
 
 from openapi_spec_validator.exceptions import (
     ParameterDuplicateError, ExtraParametersError, UnresolvableParameterError,
-    OpenAPIValidationError, DuplicateOperationIDError,
+    OpenAPIValidationError, DuplicateOperationIDError, CircularReferenceError,
 )
 from openapi_spec_validator.decorators import ValidationErrorWrapper
 from openapi_spec_validator.managers import ResolverManager
@@ -15,27 +16,76 @@ log = logging.getLogger(__name__)
 
 wraps_errors = ValidationErrorWrapper(OpenAPIValidationError)
 
+_PATH_PARAM_RE = re.compile(r'\{([^{}]+)\}')
+_extract_path_params = _PATH_PARAM_RE.findall
 
-def is_ref(spec):
-    return isinstance(spec, dict) and '$ref' in spec
+_MISS = object()
+IN_PROGRESS = object()
+
+
+def is_ref(spec, _dict=dict):
+    return isinstance(spec, _dict) and '$ref' in spec
 
 
 class Dereferencer(object):
 
+    __slots__ = ('resolver_manager', '_cache')
+
     def __init__(self, spec_resolver):
         self.resolver_manager = ResolverManager(spec_resolver)
+        self._cache = {}
 
     def dereference(self, item):
         log.debug("Dereferencing %s", item)
-        if item is None or not is_ref(item):
+        if not isinstance(item, dict) or '$ref' not in item:
             return item
 
-        ref = item['$ref']
         with self.resolver_manager.in_scope(item) as resolver:
-            with resolver.resolving(ref) as target:
-                if is_ref(target):
-                    target = self.dereference(target)
-                return target
+            key = (resolver.resolution_scope, item['$ref'])
+            cached = self._cache.get(key, _MISS)
+            if cached is not _MISS:
+                return cached
+
+            return self._resolve_chain(resolver, key)
+
+    def _resolve_chain(self, resolver, key):
+        # Follows $ref -> $ref chains iteratively. Scopes are pushed
+        # on a copy of the stack so relative refs in each hop resolve
+        # against the document they were found in.
+        pending = []
+        saved_scopes = resolver._scopes_stack
+        resolver._scopes_stack = list(saved_scopes)
+        try:
+            while True:
+                self._cache[key] = IN_PROGRESS
+                pending.append(key)
+                url, target = resolver.resolve(key[1])
+                if not isinstance(target, dict) or '$ref' not in target:
+                    break
+
+                # the fragment plays no part in resolving relative refs;
+                # dropping it lets hops share cache keys
+                resolver.push_scope(urldefrag(url)[0])
+                if 'x-scope' in target:
+                    resolver._scopes_stack = list(target['x-scope'])
+                key = (resolver.resolution_scope, target['$ref'])
+                cached = self._cache.get(key, _MISS)
+                if cached is IN_PROGRESS:
+                    # circular chain of $refs; stop at the current node
+                    break
+                if cached is not _MISS:
+                    target = cached
+                    break
+        except BaseException:
+            for key in pending:
+                del self._cache[key]
+            raise
+        finally:
+            resolver._scopes_stack = saved_scopes
+
+        for key in pending:
+            self._cache[key] = target
+        return target
 
 
 class SpecValidator(object):
@@ -51,19 +101,34 @@ class SpecValidator(object):
     @wraps_errors
     def iter_errors(self, spec, spec_url=''):
         spec_resolver = self._get_resolver(spec_url, spec)
-        dereferencer = self._get_dereferencer(spec_resolver)
 
         validator = self._get_validator(spec_resolver)
-        for err in validator.iter_errors(spec):
-            yield err
+        yield from validator.iter_errors(spec)
+
+        # Built only once the schema pass is exhausted, so validate()
+        # raising on a schema error never pays for the semantic checks.
+        # Helper validators are shared across the whole spec traversal.
+        dereferencer = self._get_dereferencer(spec_resolver)
+        value_validator = ValueValidator(dereferencer)
+        schema_validator = SchemaValidator(
+            dereferencer, value_validator=value_validator)
+        parameter_validator = ParameterValidator(
+            dereferencer,
+            schema_validator=schema_validator,
+            value_validator=value_validator,
+        )
+        parameters_validator = ParametersValidator(
+            dereferencer, parameter_validator=parameter_validator)
+        paths_validator = PathsValidator(
+            dereferencer, parameters_validator=parameters_validator)
+        components_validator = ComponentsValidator(
+            dereferencer, schema_validator=schema_validator)
 
         paths = spec.get('paths', {})
-        for err in self._iter_paths_errors(paths, dereferencer):
-            yield err
+        yield from paths_validator.iter_errors(paths)
 
         components = spec.get('components', {})
-        for err in self._iter_components_errors(components, dereferencer):
-            yield err
+        yield from components_validator.iter_errors(components)
 
     def _get_resolver(self, base_uri, referrer):
         return RefResolver(
@@ -75,50 +140,52 @@ class SpecValidator(object):
     def _get_validator(self, spec_resolver):
         return self.validator_factory.create(spec_resolver)
 
-    def _iter_paths_errors(self, paths, dereferencer):
-        return PathsValidator(dereferencer).iter_errors(paths)
-
-    def _iter_components_errors(self, components, dereferencer):
-        return ComponentsValidator(dereferencer).iter_errors(components)
-
 
 class ComponentsValidator(object):
 
-    def __init__(self, dereferencer):
+    __slots__ = ('dereferencer', 'schemas_validator')
+
+    def __init__(self, dereferencer, schema_validator=None):
         self.dereferencer = dereferencer
+        self.schemas_validator = SchemasValidator(
+            dereferencer, schema_validator=schema_validator)
 
     @wraps_errors
     def iter_errors(self, components):
         components_deref = self.dereferencer.dereference(components)
 
         schemas = components_deref.get('schemas', {})
-        for err in self._iter_schemas_errors(schemas):
-            yield err
-
-    def _iter_schemas_errors(self, schemas):
-        return SchemasValidator(self.dereferencer).iter_errors(schemas)
+        yield from self.schemas_validator.iter_errors(schemas)
 
 
 class SchemasValidator(object):
 
-    def __init__(self, dereferencer):
+    __slots__ = ('dereferencer', 'schema_validator')
+
+    def __init__(self, dereferencer, schema_validator=None):
         self.dereferencer = dereferencer
+        self.schema_validator = schema_validator or \
+            SchemaValidator(dereferencer)
 
     @wraps_errors
     def iter_errors(self, schemas):
         schemas_deref = self.dereferencer.dereference(schemas)
         for name, schema in schemas_deref.items():
-            for err in self._iter_schema_errors(schema):
-                yield err
-
-    def _iter_schema_errors(self, schema):
-        return SchemaValidator(self.dereferencer).iter_errors(schema)
+            yield from self.schema_validator.iter_errors(schema)
 
 
 class SchemaValidator(object):
 
-    def __init__(self, dereferencer):
+    __slots__ = (
+        'dereferencer', 'visited', 'required_checked', 'value_validator',
+    )
+
+    def __init__(self, dereferencer, visited=None, value_validator=None):
         self.dereferencer = dereferencer
+        self.visited = set() if visited is None else visited
+        self.required_checked = set()
+        self.value_validator = value_validator or \
+            ValueValidator(dereferencer)
 
     @wraps_errors
     def iter_errors(self, schema, require_properties=True):
@@ -126,140 +193,160 @@ class SchemaValidator(object):
         if not isinstance(schema_deref, dict):
             return
 
-        if 'allOf' in schema_deref:
+        # shared subschemas are validated only once per traversal;
+        # the required check is tracked apart so a visit through allOf
+        # does not hide it
+        key = id(schema_deref)
+        walk = key not in self.visited
+        self.visited.add(key)
+
+        if walk and 'allOf' in schema_deref:
             for inner_schema in schema_deref['allOf']:
-                for err in self.iter_errors(
-                    inner_schema,
-                    require_properties=False
-                ):
-                    yield err
-
-        required = schema_deref.get('required', [])
-        properties = schema_deref.get('properties', {}).keys()
-        extra_properties = list(set(required) - set(properties))
-        if extra_properties and require_properties:
-            yield ExtraParametersError(
-                "Required list has not defined properties: {0}".format(
-                    extra_properties
+                yield from self.iter_errors(
+                    inner_schema, require_properties=False)
+
+        if require_properties and key not in self.required_checked:
+            self.required_checked.add(key)
+            required = schema_deref.get('required') or []
+            properties = schema_deref.get('properties') or {}
+            extra_properties = [
+                name for name in dict.fromkeys(required)
+                if name not in properties
+            ]
+            if extra_properties:
+                yield ExtraParametersError(
+                    "Required list has not defined properties: {0}".format(
+                        extra_properties
+                    )
                 )
-            )
 
-        if 'default' in schema_deref:
+        if walk and 'default' in schema_deref:
             default = schema_deref['default']
             nullable = schema_deref.get('nullable', False)
             if default is not None or nullable is not True:
-                for err in self._iter_value_errors(schema_deref, default):
-                    yield err
-
-    def _iter_value_errors(self, schema, value):
-        return ValueValidator(self.dereferencer).iter_errors(schema, value)
+                yield from self.value_validator.iter_errors(
+                    schema_deref, default)
 
 
 class PathsValidator(object):
 
-    def __init__(self, dereferencer, operation_ids_registry=None):
+    __slots__ = ('dereferencer', 'operation_ids_registry', 'path_validator')
+
+    def __init__(self, dereferencer, operation_ids_registry=None,
+                 parameters_validator=None):
         self.dereferencer = dereferencer
-        self.operation_ids_registry = [] if operation_ids_registry is None \
+        self.operation_ids_registry = set() if operation_ids_registry is None \
             else operation_ids_registry
+        self.path_validator = PathValidator(
+            dereferencer, self.operation_ids_registry,
+            parameters_validator=parameters_validator,
+        )
 
     @wraps_errors
     def iter_errors(self, paths):
         paths_deref = self.dereferencer.dereference(paths)
         for url, path_item in paths_deref.items():
-            for err in self._iter_path_errors(url, path_item):
-                yield err
-
-    def _iter_path_errors(self, url, path_item):
-        return PathValidator(
-            self.dereferencer, self.operation_ids_registry).iter_errors(
-                url, path_item)
+            yield from self.path_validator.iter_errors(url, path_item)
 
 
 class PathValidator(object):
 
-    def __init__(self, dereferencer, operation_ids_registry=None):
+    __slots__ = (
+        'dereferencer', 'operation_ids_registry', 'path_item_validator',
+    )
+
+    def __init__(self, dereferencer, operation_ids_registry=None,
+                 parameters_validator=None):
         self.dereferencer = dereferencer
-        self.operation_ids_registry = [] if operation_ids_registry is None \
+        self.operation_ids_registry = set() if operation_ids_registry is None \
             else operation_ids_registry
+        self.path_item_validator = PathItemValidator(
+            dereferencer, self.operation_ids_registry,
+            parameters_validator=parameters_validator,
+        )
 
     @wraps_errors
     def iter_errors(self, url, path_item):
         path_item_deref = self.dereferencer.dereference(path_item)
 
-        for err in self._iter_path_item_errors(url, path_item_deref):
-            yield err
-
-    def _iter_path_item_errors(self, url, path_item):
-        return PathItemValidator(
-            self.dereferencer, self.operation_ids_registry).iter_errors(
-                url, path_item)
+        yield from self.path_item_validator.iter_errors(url, path_item_deref)
 
 
 class PathItemValidator(object):
 
-    OPERATIONS = [
+    __slots__ = (
+        'dereferencer', 'operation_ids_registry', 'parameters_validator',
+        'operation_validator',
+    )
+
+    OPERATIONS = (
         'get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace',
-    ]
+    )
 
-    def __init__(self, dereferencer, operation_ids_registry=None):
+    def __init__(self, dereferencer, operation_ids_registry=None,
+                 parameters_validator=None):
         self.dereferencer = dereferencer
-        self.operation_ids_registry = [] if operation_ids_registry is None \
+        self.operation_ids_registry = set() if operation_ids_registry is None \
             else operation_ids_registry
+        self.parameters_validator = parameters_validator or \
+            ParametersValidator(dereferencer)
+        self.operation_validator = OperationValidator(
+            dereferencer, self.operation_ids_registry,
+            parameters_validator=self.parameters_validator,
+        )
 
     @wraps_errors
     def iter_errors(self, url, path_item):
         path_item_deref = self.dereferencer.dereference(path_item)
 
         parameters = path_item_deref.get('parameters', [])
-        for err in self._iter_parameters_errors(parameters):
-            yield err
+        yield from self.parameters_validator.iter_errors(parameters)
 
-        for field_name, operation in path_item.items():
-            if field_name not in self.OPERATIONS:
+        for field_name in self.OPERATIONS:
+            operation = path_item_deref.get(field_name)
+            if operation is None:
                 continue
 
-            for err in self._iter_operation_errors(
-                    url, field_name, operation, parameters):
-                yield err
-
-    def _iter_operation_errors(self, url, name, operation, path_parameters):
-        return OperationValidator(
-            self.dereferencer, self.operation_ids_registry).iter_errors(
-                url, name, operation, path_parameters)
-
-    def _iter_parameters_errors(self, parameters):
-        return ParametersValidator(self.dereferencer).iter_errors(parameters)
+            yield from self.operation_validator.iter_errors(
+                url, field_name, operation, parameters)
 
 
 class OperationValidator(object):
 
-    def __init__(self, dereferencer, seen_ids=None):
+    __slots__ = ('dereferencer', 'seen_ids', 'parameters_validator')
+
+    def __init__(self, dereferencer, seen_ids=None,
+                 parameters_validator=None):
         self.dereferencer = dereferencer
-        self.seen_ids = [] if seen_ids is None else seen_ids
+        self.seen_ids = set() if seen_ids is None else seen_ids
+        self.parameters_validator = parameters_validator or \
+            ParametersValidator(dereferencer)
 
     @wraps_errors
     def iter_errors(self, url, name, operation, path_parameters=None):
         path_parameters = path_parameters or []
         operation_deref = self.dereferencer.dereference(operation)
 
+        # non-string ids are already reported by the schema pass
+        # and may not be hashable
         operation_id = operation_deref.get('operationId')
-        if operation_id is not None and operation_id in self.seen_ids:
-            yield DuplicateOperationIDError(
-                "Operation ID '{0}' for '{1}' in '{2}' is not unique".format(
-                    operation_id, name, url)
-            )
-        self.seen_ids.append(operation_id)
+        if isinstance(operation_id, str):
+            if operation_id in self.seen_ids:
+                yield DuplicateOperationIDError(
+                    "Operation ID '{0}' for '{1}' in '{2}' is not unique"
+                    .format(operation_id, name, url)
+                )
+            self.seen_ids.add(operation_id)
 
         parameters = operation_deref.get('parameters', [])
-        for err in self._iter_parameters_errors(parameters):
-            yield err
+        yield from self.parameters_validator.iter_errors(parameters)
 
-        all_params = list(set(
-            list(self._get_path_param_names(path_parameters)) +
-            list(self._get_path_param_names(parameters))
-        ))
+        all_params = set()
+        all_params.update(self._get_path_param_names(path_parameters))
+        all_params.update(self._get_path_param_names(parameters))
 
-        for path in self._get_path_params_from_url(url):
+        # the regex only matches non-empty names, no filtering needed
+        for path in _extract_path_params(url):
             if path not in all_params:
                 yield UnresolvableParameterError(
                     "Path parameter '{0}' for '{1}' operation in '{2}' "
@@ -270,80 +357,96 @@ class OperationValidator(object):
     def _get_path_param_names(self, params):
         for param in params:
             param_deref = self.dereferencer.dereference(param)
+            # circular refs are reported by ParametersValidator
+            if is_ref(param_deref):
+                continue
             if param_deref['in'] == 'path':
                 yield param_deref['name']
 
-    def _get_path_params_from_url(self, url):
-        formatter = string.Formatter()
-        path_params = [item[1] for item in formatter.parse(url)]
-        return filter(None, path_params)
-
-    def _iter_parameters_errors(self, parameters):
-        return ParametersValidator(self.dereferencer).iter_errors(parameters)
-
 
 class ParametersValidator(object):
 
-    def __init__(self, dereferencer):
+    __slots__ = ('dereferencer', 'parameter_validator')
+
+    def __init__(self, dereferencer, parameter_validator=None):
         self.dereferencer = dereferencer
+        self.parameter_validator = parameter_validator or \
+            ParameterValidator(dereferencer)
 
     @wraps_errors
     def iter_errors(self, parameters):
+        dereference = self.dereferencer.dereference
         seen = set()
         for parameter in parameters:
-            parameter_deref = self.dereferencer.dereference(parameter)
-            for err in self._iter_parameter_errors(parameter_deref):
-                yield err
+            parameter_deref = dereference(parameter)
+            if is_ref(parameter_deref):
+                yield CircularReferenceError(
+                    "Circular reference `{0}`".format(parameter['$ref'])
+                )
+                continue
+
+            yield from self.parameter_validator.iter_errors(parameter_deref)
 
-            key = (parameter_deref['name'], parameter_deref['in'])
+            name = parameter_deref['name']
+            key = (name, parameter_deref['in'])
             if key in seen:
                 yield ParameterDuplicateError(
-                    "Duplicate parameter `{0}`".format(parameter_deref['name'])
+                    "Duplicate parameter `{0}`".format(name)
                 )
             seen.add(key)
 
-    def _iter_parameter_errors(self, parameter):
-        return ParameterValidator(self.dereferencer).iter_errors(parameter)
-
 
 class ParameterValidator(object):
 
-    def __init__(self, dereferencer):
+    __slots__ = ('dereferencer', 'schema_validator', 'value_validator')
+
+    def __init__(self, dereferencer, schema_validator=None,
+                 value_validator=None):
         self.dereferencer = dereferencer
+        self.value_validator = value_validator or \
+            ValueValidator(dereferencer)
+        self.schema_validator = schema_validator or \
+            SchemaValidator(
+                dereferencer, value_validator=self.value_validator)
 
     @wraps_errors
     def iter_errors(self, parameter):
         if 'schema' in parameter:
+            # SchemaValidator dereferences the schema itself
             schema = parameter['schema']
-            schema_deref = self.dereferencer.dereference(schema)
-            for err in self._iter_schema_errors(schema_deref):
-                yield err
+            yield from self.schema_validator.iter_errors(schema)
 
         if 'default' in parameter:
             # only possible in swagger 2.0
             default = parameter['default']
             if default is not None:
-                for err in self._iter_value_errors(parameter, default):
-                    yield err
+                yield from self.value_validator.iter_errors(parameter, default)
 
-    def _iter_value_errors(self, schema, value):
-        return ValueValidator(self.dereferencer).iter_errors(schema, value)
 
-    def _iter_schema_errors(self, schema):
-        return SchemaValidator(self.dereferencer).iter_errors(schema)
+class ValueValidator(object):
 
+    __slots__ = ('dereferencer', '_cache')
 
-class ValueValidator(object):
+    validator_class = OAS31Validator
+    format_checker = oas31_format_checker
 
     def __init__(self, dereferencer):
         self.dereferencer = dereferencer
+        self._cache = {}
 
     @wraps_errors
     def iter_errors(self, schema, value):
-        validator = OAS31Validator(
-            schema,
-            resolver=self.dereferencer.resolver_manager.resolver,
-            format_checker=oas31_format_checker,
-        )
-        for err in validator.iter_errors(value):
-            yield err
+        validator = self._get_validator(schema)
+        yield from validator.iter_errors(value)
+
+    def _get_validator(self, schema):
+        # schemas live in the spec for the whole run, so id() is stable
+        key = id(schema)
+        validator = self._cache.get(key)
+        if validator is None:
+            validator = self._cache[key] = self.validator_class(
+                schema,
+                resolver=self.dereferencer.resolver_manager.resolver,
+                format_checker=self.format_checker,
+            )
+        return validator
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from jsonschema.exceptions import ValidationError
+
+from openapi_spec_validator import decorators
+from openapi_spec_validator.exceptions import OpenAPIValidationError
+
+
+def iter_errors():
+    yield ValidationError('raw error')
+    yield OpenAPIValidationError('wrapped error')
+
+
+class TestValidationErrorWrapper(object):
+
+    @mock.patch.object(decorators, '_WRAP_ERRORS', True)
+    def test_wraps_errors(self):
+        wrapper = decorators.ValidationErrorWrapper(OpenAPIValidationError)
+
+        errors_list = list(wrapper(iter_errors)())
+
+        assert len(errors_list) == 2
+        assert errors_list[0].__class__ == OpenAPIValidationError
+        assert errors_list[0].message == 'raw error'
+        assert errors_list[1].__class__ == OpenAPIValidationError
+        assert errors_list[1].message == 'wrapped error'
+
+    @mock.patch.object(decorators, '_WRAP_ERRORS', False)
+    def test_disabled(self):
+        wrapper = decorators.ValidationErrorWrapper(OpenAPIValidationError)
+
+        wrapped = wrapper(iter_errors)
+
+        assert wrapped is iter_errors
+        errors_list = list(wrapped())
+        assert errors_list[0].__class__ == ValidationError
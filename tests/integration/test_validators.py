@@ -1,6 +1,16 @@
+from unittest import mock
+
+import pytest
+from jsonschema.validators import RefResolver
+from openapi_schema_validator import OAS31Validator
+
+from openapi_spec_validator import default_handlers
 from openapi_spec_validator.exceptions import (
     ExtraParametersError, UnresolvableParameterError, OpenAPIValidationError,
-    DuplicateOperationIDError,
+    DuplicateOperationIDError, CircularReferenceError,
+)
+from openapi_spec_validator.validators import (
+    Dereferencer, PathItemValidator, SpecValidator, ValueValidator,
 )
 
 
@@ -378,3 +388,414 @@ class TestSpecValidatorIterErrors(object):
 
         errors_list = list(errors)
         assert errors_list == []
+
+    @mock.patch.object(
+        RefResolver, 'resolve', autospec=True,
+        side_effect=RefResolver.resolve,
+    )
+    @mock.patch.object(SpecValidator, '_get_validator')
+    def test_reused_parameter_reference(
+            self, m_get_validator, m_resolve, validator_v30):
+        # skip the schema pass, it resolves refs through the same resolver
+        m_get_validator.return_value.iter_errors.return_value = []
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {
+                '/test/{param1}': {
+                    'get': {
+                        'responses': {
+                            'default': {
+                                'description': 'default response',
+                            },
+                        },
+                        'parameters': [
+                            {'$ref': '#/components/parameters/param1'},
+                        ],
+                    },
+                },
+                '/test2/{param1}': {
+                    'get': {
+                        'responses': {
+                            'default': {
+                                'description': 'default response',
+                            },
+                        },
+                        'parameters': [
+                            {'$ref': '#/components/parameters/param1'},
+                        ],
+                    },
+                },
+            },
+            'components': {
+                'parameters': {
+                    'param1': {
+                        '$ref': '#/components/parameters/alias',
+                    },
+                    'alias': {
+                        'name': 'param1',
+                        'in': 'path',
+                        'schema': {
+                            'type': 'integer',
+                        },
+                        'required': True,
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert errors_list == []
+        resolved_refs = [call[0][1] for call in m_resolve.call_args_list]
+        assert resolved_refs.count('#/components/parameters/param1') == 1
+
+    def test_shared_schema_errors_reported_once(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {
+                '/test/': {
+                    'get': {
+                        'responses': {
+                            'default': {
+                                'description': 'default response',
+                            },
+                        },
+                        'parameters': [
+                            {
+                                'name': 'param1',
+                                'in': 'query',
+                                'schema': {
+                                    '$ref': '#/components/schemas/bad',
+                                },
+                            },
+                            {
+                                'name': 'param2',
+                                'in': 'query',
+                                'schema': {
+                                    '$ref': '#/components/schemas/bad',
+                                },
+                            },
+                        ],
+                    },
+                },
+            },
+            'components': {
+                'schemas': {
+                    'bad': {
+                        'type': 'object',
+                        'required': ['testparam1'],
+                    },
+                    'alias': {
+                        '$ref': '#/components/schemas/bad',
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 1
+        assert errors_list[0].__class__ == ExtraParametersError
+
+    def test_allof_schema_default_validated_once(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {},
+            'components': {
+                'schemas': {
+                    'Def': {
+                        'type': 'integer',
+                        'default': 'invaldtype',
+                    },
+                    'Def2': {
+                        'allOf': [
+                            {'$ref': '#/components/schemas/Def'},
+                        ],
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 1
+        assert errors_list[0].message == (
+            "'invaldtype' is not of type 'integer'"
+        )
+
+    def test_allof_first_keeps_required_check(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {},
+            'components': {
+                'schemas': {
+                    'A': {
+                        'allOf': [
+                            {'$ref': '#/components/schemas/B'},
+                        ],
+                    },
+                    'B': {
+                        'type': 'object',
+                        'required': ['testparam1'],
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 1
+        assert errors_list[0].__class__ == ExtraParametersError
+
+    def test_circular_parameter_reference(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {
+                '/test/{param1}': {
+                    'get': {
+                        'responses': {
+                            'default': {
+                                'description': 'default response',
+                            },
+                        },
+                        'parameters': [
+                            {'$ref': '#/components/parameters/param1'},
+                        ],
+                    },
+                },
+            },
+            'components': {
+                'parameters': {
+                    'param1': {
+                        '$ref': '#/components/parameters/alias',
+                    },
+                    'alias': {
+                        '$ref': '#/components/parameters/param1',
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = [
+            err for err in errors
+            if err.__class__ == CircularReferenceError
+        ]
+        assert len(errors_list) == 1
+        assert errors_list[0].message == (
+            "Circular reference `#/components/parameters/param1`"
+        )
+
+    @mock.patch.object(
+        ValueValidator, 'validator_class', wraps=OAS31Validator)
+    def test_shared_value_validator(self, m_validator_class, validator_v2):
+        spec = {
+            'swagger': '2.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {
+                '/test/': {
+                    'get': {
+                        'responses': {
+                            '200': {
+                                'description': 'OK',
+                            },
+                        },
+                        'parameters': [
+                            {'$ref': '#/parameters/param1'},
+                        ],
+                    },
+                },
+                '/test2/': {
+                    'get': {
+                        'responses': {
+                            '200': {
+                                'description': 'OK',
+                            },
+                        },
+                        'parameters': [
+                            {'$ref': '#/parameters/param1'},
+                        ],
+                    },
+                },
+            },
+            'parameters': {
+                'param1': {
+                    'name': 'param1',
+                    'in': 'query',
+                    'type': 'integer',
+                    'default': 'invaldtype',
+                },
+            },
+        }
+
+        errors = validator_v2.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 2
+        for err in errors_list:
+            assert err.__class__ == OpenAPIValidationError
+            assert err.message == "'invaldtype' is not of type 'integer'"
+        m_validator_class.assert_called_once()
+
+    def test_extra_parameters_in_required_duplicates(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {},
+            'components': {
+                'schemas': {
+                    'testSchema': {
+                        'type': 'object',
+                        'required': ['b', 'a', 'b'],
+                    }
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = [
+            err for err in errors
+            if err.__class__ == ExtraParametersError
+        ]
+        assert len(errors_list) == 1
+        assert errors_list[0].message == (
+            "Required list has not defined properties: ['b', 'a']"
+        )
+
+    def test_operation_id_not_string(self, validator_v30):
+        spec = {
+            'openapi': '3.0.0',
+            'info': {
+                'title': 'Test Api',
+                'version': '0.0.1',
+            },
+            'paths': {
+                '/test': {
+                    'get': {
+                        'operationId': ['operation1'],
+                        'responses': {
+                            'default': {
+                                'description': 'default response',
+                            },
+                        },
+                    },
+                },
+            },
+        }
+
+        errors = validator_v30.iter_errors(spec)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 1
+        assert errors_list[0].__class__ == OpenAPIValidationError
+        assert errors_list[0].message == (
+            "['operation1'] is not of type 'string'"
+        )
+
+    def test_relative_reference_chain(self, factory, validator_v30):
+        spec_file = "data/v3.0/relative-ref-chain/openapi.yaml"
+        spec_url = factory.spec_url(spec_file)
+        spec = factory.spec_from_file(spec_file)
+
+        errors = validator_v30.iter_errors(spec, spec_url=spec_url)
+
+        errors_list = list(errors)
+        assert errors_list == []
+        parameter = spec['paths']['/pets/{petId}']['get']['parameters'][0]
+        assert parameter['x-scope'] == [spec_url]
+
+    def test_dereference_relative_reference_chain(self, factory):
+        # no schema pass, so there is no x-scope to fall back on
+        spec_file = "data/v3.0/relative-ref-chain/openapi.yaml"
+        spec_url = factory.spec_url(spec_file)
+        spec = factory.spec_from_file(spec_file)
+        resolver = RefResolver(spec_url, spec, handlers=default_handlers)
+        dereferencer = Dereferencer(resolver)
+        parameter = spec['paths']['/pets/{petId}']['get']['parameters'][0]
+
+        parameter_deref = dereferencer.dereference(parameter)
+
+        assert parameter_deref['name'] == 'petId'
+        assert resolver._scopes_stack == [spec_url]
+
+
+class TestSpecValidatorValidate(object):
+
+    @mock.patch.object(SpecValidator, '_get_dereferencer')
+    def test_schema_error_skips_semantic_checks(
+            self, m_get_dereferencer, validator_v30):
+        spec = {}
+
+        with pytest.raises(OpenAPIValidationError):
+            validator_v30.validate(spec)
+
+        m_get_dereferencer.assert_not_called()
+
+
+class TestPathItemValidatorIterErrors(object):
+
+    def test_referenced_path_item(self):
+        spec = {
+            'components': {
+                'pathItems': {
+                    'test': {
+                        'post': {
+                            'responses': {},
+                        },
+                        'get': {
+                            'responses': {},
+                        },
+                    },
+                },
+            },
+        }
+        dereferencer = Dereferencer(RefResolver('', spec))
+        path_item = {'$ref': '#/components/pathItems/test'}
+
+        errors = PathItemValidator(dereferencer).iter_errors(
+            '/test/{param1}', path_item)
+
+        errors_list = list(errors)
+        assert len(errors_list) == 2
+        assert errors_list[0].__class__ == UnresolvableParameterError
+        assert errors_list[0].message == (
+            "Path parameter 'param1' for 'get' operation in "
+            "'/test/{param1}' was not resolved"
+        )
+        assert errors_list[1].__class__ == UnresolvableParameterError
+        assert errors_list[1].message == (
+            "Path parameter 'param1' for 'post' operation in "
+            "'/test/{param1}' was not resolved"
+        )